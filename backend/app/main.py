@@ -1,28 +1,80 @@
+import asyncio
+import base64
 import os
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from functools import lru_cache
+from fastapi import BackgroundTasks, Depends, FastAPI, File, UploadFile, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.datastructures import Headers
 from dotenv import load_dotenv
+import aiofiles
+from aiolimiter import AsyncLimiter
+from cachetools import TTLCache
+import math
+import shutil
+import tempfile
+import hashlib
 import json
+import re
+import logging
+import logging.config
+import queue
+import atexit
+from logging.handlers import QueueListener
 from deepgram import (
     DeepgramClient,
     PrerecordedOptions,
     FileSource,
 )
-from typing import List
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from uuid import uuid4
 from datetime import datetime
 from supabase import create_client, Client
 from pydantic import BaseModel
+from pydantic_settings import BaseSettings
 from pathlib import Path
 import time
 
 load_dotenv()
 
+# Logging: records are queued by the calling thread and written to stderr by a listener thread,
+# so the event loop never blocks on stream I/O. Uvicorn's own loggers share the same queue.
+# LOG_LEVEL applies to the app and uvicorn; third-party libraries (httpx, ...) stay at WARNING.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+log_queue: queue.Queue = queue.Queue(-1)
+logging.config.dictConfig({
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "queue": {"class": "logging.handlers.QueueHandler", "queue": log_queue},
+    },
+    "loggers": {
+        "app": {"level": LOG_LEVEL},
+        "uvicorn": {"level": LOG_LEVEL, "handlers": ["queue"], "propagate": False},
+        "uvicorn.error": {"level": LOG_LEVEL},
+        "uvicorn.access": {"level": LOG_LEVEL, "handlers": ["queue"], "propagate": False},
+    },
+    "root": {"level": "WARNING", "handlers": ["queue"]},
+})
+
+log_output = logging.StreamHandler()
+log_output.setFormatter(logging.Formatter(LOG_FORMAT))
+log_listener = QueueListener(log_queue, log_output)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+logger = logging.getLogger(__name__)
+
 class TranscriptResponse(BaseModel):
     id: int
     text: str
     status: str
     created_at: datetime
-    audio_url: str = None
+    audio_url: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -31,18 +83,364 @@ class TranscriptRequest(BaseModel):
     text: str
     status: str
 
+class Settings(BaseSettings):
+    """
+    Runtime configuration read from the environment (or .env).
+    """
+    cors_origins: List[str] = ["http://localhost:5173"]
+    
+    # Deepgram transcription options
+    dg_model: str = "nova-3"
+    dg_language: str = "en"
+    dg_smart_format: bool = True
+    dg_punctuate: bool = True
+    dg_diarize: bool = False
+    dg_utterances: bool = False
+    
+    def deepgram_opts(self) -> dict:
+        return {
+            "model": self.dg_model,
+            "language": self.dg_language,
+            "smart_format": self.dg_smart_format,
+            "punctuate": self.dg_punctuate,
+            "diarize": self.dg_diarize,
+            "utterances": self.dg_utterances,
+        }
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
 # Configure Deepgram
 DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
 if not DEEPGRAM_API_KEY:
     raise ValueError("No DEEPGRAM_API_KEY in .env")
 
+@lru_cache(maxsize=1)
+def get_deepgram() -> DeepgramClient:
+    """
+    Shared Deepgram client, built once instead of on every request.
+    """
+    return DeepgramClient(DEEPGRAM_API_KEY)
+
 # Configure Supabase
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 if not SUPABASE_KEY:
     raise ValueError("No SUPABASE_KEY in .env")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+@lru_cache(maxsize=1)
+def get_supabase() -> Client:
+    """
+    Shared Supabase client so its PostgREST HTTP connection pool is reused across requests.
+    """
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Columns served by the transcript endpoints (matches TranscriptResponse)
+TRANSCRIPT_COLUMNS = "id,text,status,created_at,audio_url"
+
+# Deepgram backpressure: cap in-flight requests and the request rate per window
+DG_CONCURRENCY = int(os.getenv("DG_CONCURRENCY", "8"))
+DG_RATE_LIMIT = int(os.getenv("DG_RATE_LIMIT", "20000"))
+DG_RATE_PERIOD = int(os.getenv("DG_RATE_PERIOD", "300"))
+
+DEEPGRAM_SEMA = asyncio.Semaphore(DG_CONCURRENCY)
+DEEPGRAM_LIMITER = AsyncLimiter(DG_RATE_LIMIT, DG_RATE_PERIOD)
+
+# Short-lived cache of GET /transcripts, cleared whenever a transcript changes
+TRANSCRIPTS_CACHE_TTL = 5
+transcripts_cache = TTLCache(maxsize=32, ttl=TRANSCRIPTS_CACHE_TTL)
+
+# GET /transcripts page sizes
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def invalidate_transcripts_cache():
+    transcripts_cache.clear()
+
+def encode_cursor(transcript: dict) -> str:
+    """
+    Build an opaque pagination cursor from the last transcript of a page.
+    """
+    key = f"{transcript['created_at']},{transcript['id']}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+# Characters a Postgres timestamp can contain; keeps cursor values from altering the PostgREST filter
+CURSOR_TIMESTAMP_CHARS = re.compile(r"[0-9T:.+\- Z]+")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    # The timestamp is passed through as produced by encode_cursor; PostgREST validates it
+    try:
+        created_at, transcript_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit(",", 1)
+        if not CURSOR_TIMESTAMP_CHARS.fullmatch(created_at):
+            raise ValueError(created_at)
+        return created_at, int(transcript_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def make_etag(data) -> str:
+    """
+    Build a strong ETag from the JSON representation of a response body.
+    """
+    body = json.dumps(data, sort_keys=True, default=str).encode()
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+# Uploads are spooled to disk and forwarded to Deepgram in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "500")) * 1024 * 1024
+UPLOAD_DIR = Path(tempfile.gettempdir()) / "speech-app-uploads"
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+# Audio longer than this is split and the chunks are transcribed in parallel
+AUDIO_CHUNK_SECONDS = int(os.getenv("AUDIO_CHUNK_SECONDS", "300"))
+
+def is_audio_signature(head: bytes) -> bool:
+    """
+    Check the first bytes of a file against the magic numbers of common audio containers.
+    """
+    return (
+        (head.startswith(b"RIFF") and head[8:12] == b"WAVE")
+        or head.startswith((b"ID3", b"OggS", b"fLaC", b"#!AMR", b"\x1a\x45\xdf\xa3"))  # EBML: WebM/Matroska
+        or head[4:8] == b"ftyp"  # MP4/M4A
+        or (len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0)  # MPEG/AAC frame sync
+    )
+
+async def save_upload(file: UploadFile, path: Path) -> Tuple[int, str]:
+    """
+    Copy the uploaded file to disk chunk by chunk.
+    Returns its size in bytes and the SHA-256 hex digest of its content.
+    Raises a 413 HTTPException once the file grows past MAX_UPLOAD_BYTES.
+    """
+    size = 0
+    digest = hashlib.sha256()
+    async with aiofiles.open(path, "wb") as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="Audio file is too large")
+            digest.update(chunk)
+            await out.write(chunk)
+    return size, digest.hexdigest()
+
+def deepgram_options_hash() -> str:
+    """
+    Hash of the Deepgram options in effect, so transcripts are only reused for the same settings.
+    """
+    options = json.dumps(get_settings().deepgram_opts(), sort_keys=True).encode()
+    return hashlib.sha256(options).hexdigest()
+
+async def find_cached_transcript(audio_hash: str, options_hash: str) -> Optional[str]:
+    """
+    Return the text of a completed transcript of identical audio made with the same options, if there is one.
+    """
+    try:
+        response = await asyncio.to_thread(
+            get_supabase().table("transcripts").select("text")
+            .eq("audio_hash", audio_hash).eq("options_hash", options_hash)
+            .eq("status", "completed").limit(1).execute
+        )
+        if response.data:
+            return response.data[0]["text"]
+    except Exception as e:
+        logger.error("Error looking up cached transcript: %s", e)
+    return None
+
+async def iter_audio_file(path: Path) -> AsyncIterator[bytes]:
+    """
+    Yield an audio file in chunks so it is never fully buffered in memory.
+    """
+    async with aiofiles.open(path, "rb") as audio:
+        while chunk := await audio.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
+
+async def run_command(*args: str) -> bytes:
+    """
+    Run an external command (ffmpeg/ffprobe) without blocking the event loop and return its stdout.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"{args[0]} failed: {stderr.decode(errors='replace')[-500:]}")
+    return stdout
+
+async def probe_duration(path: Path) -> Optional[float]:
+    """
+    Return the duration of an audio file in seconds, or None when the container doesn't record it.
+    """
+    try:
+        output = await run_command(
+            "ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(path)
+        )
+        return float(output.decode().strip())
+    except (OSError, RuntimeError) as e:
+        logger.warning("Could not probe audio duration, transcribing in one piece: %s", e)
+        return None
+    except ValueError:
+        return None
+
+def expected_chunk_count(duration: Optional[float]) -> int:
+    """
+    Number of Deepgram requests a file of this duration will be transcribed with.
+    """
+    if not duration or duration <= AUDIO_CHUNK_SECONDS:
+        return 1
+    return min(math.ceil(duration / AUDIO_CHUNK_SECONDS), DG_RATE_LIMIT)
+
+async def split_audio(path: Path, chunk_seconds: int = AUDIO_CHUNK_SECONDS) -> List[Tuple[Path, float]]:
+    """
+    Split an audio file into segments of about chunk_seconds without re-encoding.
+    Returns each segment's path with its start offset in the original audio.
+    """
+    chunk_dir = UPLOAD_DIR / path.stem
+    chunk_dir.mkdir(exist_ok=True)
+    segment_list = chunk_dir / "segments.csv"
+    await run_command(
+        "ffmpeg", "-v", "error", "-i", str(path), "-map", "0:a", "-c", "copy",
+        "-f", "segment", "-segment_time", str(chunk_seconds), "-segment_format", "matroska",
+        "-segment_list", str(segment_list), "-segment_list_type", "csv", "-reset_timestamps", "1",
+        str(chunk_dir / "%04d.mka")
+    )
+    
+    # Each line of the segment list is "<file>,<start>,<end>"
+    chunks = []
+    for line in segment_list.read_text().splitlines():
+        name, start, _ = line.rsplit(",", 2)
+        chunks.append((chunk_dir / name, float(start)))
+    return chunks
+
+async def transcribe_chunk(
+    deepgram: DeepgramClient, path: Path, options: PrerecordedOptions, offset: float = 0.0
+) -> Tuple[str, list]:
+    """
+    Transcribe one audio file with Deepgram.
+    Returns the transcript text and its words, with timestamps shifted by offset seconds.
+    """
+    # Prepare the payload, streamed from disk
+    payload: FileSource = {
+        "stream": iter_audio_file(path),
+    }
+    
+    async with DEEPGRAM_LIMITER, DEEPGRAM_SEMA:
+        response = await deepgram.listen.asyncrest.v("1").transcribe_file(payload, options)
+    
+    # Extract transcript text and words from the top alternative in a single traversal
+    channels = response.results.channels if response.results else None
+    alternatives = channels[0].alternatives if channels else None
+    alt = alternatives[0] if alternatives else None
+    transcript_text = alt.transcript if alt else ""
+    words = (alt.words or []) if alt else []
+    if offset:
+        for word in words:
+            word.start += offset
+            word.end += offset
+    
+    return transcript_text, words
+
+# Live transcription events per transcript ID, fanned out to GET /transcript/{id}/events listeners
+transcript_listeners: Dict[int, List[asyncio.Queue]] = defaultdict(list)
+EVENTS_KEEPALIVE_SECONDS = 15
+# How often a stream re-reads the record, for transcriptions running in another worker
+EVENTS_RECHECK_SECONDS = 1
+# Give up on transcripts stuck in processing, e.g. when a restart dropped their background task
+EVENTS_MAX_SECONDS = int(os.getenv("TRANSCRIPTION_TIMEOUT_SECONDS", "900"))
+
+def publish_event(transcript_id: int, event: dict):
+    for listener in transcript_listeners.get(transcript_id, []):
+        listener.put_nowait(event)
+
+async def finalize_transcript(transcript_id: int, text: str, status: str):
+    """
+    Write the final text and status of a transcript in one round-trip.
+    """
+    await asyncio.to_thread(
+        get_supabase().table("transcripts").update({
+            "text": text,
+            "status": status
+        }).eq("id", transcript_id).execute
+    )
+    invalidate_transcripts_cache()
+
+async def process_transcription(
+    transcript_id: int, audio_path: Path, deepgram: DeepgramClient, duration: Optional[float] = None
+):
+    """
+    Transcribe a saved upload with Deepgram and store the result on its transcript record.
+    Long audio is split into chunks that are transcribed concurrently and stitched back together.
+    Runs as a background task after the upload request has returned.
+    """
+    try:
+        # STEP 1: Configure Deepgram options for audio analysis
+        options = PrerecordedOptions(**get_settings().deepgram_opts())
+        
+        # STEP 2: Split long audio so the chunks can be transcribed in parallel
+        chunks = [(audio_path, 0.0)]
+        if duration and duration > AUDIO_CHUNK_SECONDS:
+            try:
+                chunks = await split_audio(audio_path)
+            except (OSError, RuntimeError, ValueError) as e:
+                logger.warning("Could not split audio, transcribing in one piece: %s", e)
+        
+        logger.info("Starting transcription with Deepgram (%d chunk(s))...", len(chunks))
+        
+        # STEP 3: Transcribe every chunk, publishing each one as soon as it is done;
+        # the Deepgram semaphore caps how many run at once
+        async def transcribe_and_publish(index: int, path: Path, offset: float):
+            text, chunk_words = await transcribe_chunk(deepgram, path, options, offset)
+            publish_event(transcript_id, {
+                "type": "partial",
+                "chunk": index,
+                "text": text,
+                "words": [{"word": word.word, "start": word.start, "end": word.end} for word in chunk_words]
+            })
+            return text, chunk_words
+        
+        tasks = [
+            asyncio.create_task(transcribe_and_publish(index, path, offset))
+            for index, (path, offset) in enumerate(chunks)
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # One failed chunk fails the transcript; stop spending Deepgram quota on the rest
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        
+        transcript_text = " ".join(text for text, _ in results if text)
+        words = [word for _, chunk_words in results for word in chunk_words]
+        
+        if not transcript_text:
+            transcript_text = "No speech detected"
+        
+        logger.info("Transcription completed: %.100s...", transcript_text)
+        logger.debug("words=%d", len(words))
+        status = "completed"
+        
+    except Exception as e:
+        logger.error("Deepgram error: %s", e)
+        transcript_text = f"Transcription error: {str(e)}"
+        status = "error"
+    
+    finally:
+        audio_path.unlink(missing_ok=True)
+        shutil.rmtree(UPLOAD_DIR / audio_path.stem, ignore_errors=True)
+    
+    # Store the outcome, success or error, with a single update
+    try:
+        await finalize_transcript(transcript_id, transcript_text, status)
+    except Exception as e:
+        logger.error("Database error: %s", e)
+    publish_event(transcript_id, {"type": status, "text": transcript_text})
 
 # FastAPI app setup
 app = FastAPI(
@@ -59,153 +457,286 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized uploads from their Content-Length before the body is received.
+    FastAPI parses the whole multipart form before the handler runs, so the handler is too late for this.
+    """
+    def __init__(self, app, path: str, max_bytes: int):
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] == self.path:
+            headers = Headers(scope=scope)
+            content_length = headers.get("content-length")
+            if content_length is None:
+                response = JSONResponse({"detail": "Content-Length header is required"}, status_code=411)
+                return await response(scope, receive, send)
+            if not content_length.isdigit() or int(content_length) > self.max_bytes:
+                response = JSONResponse({"detail": "Audio file is too large"}, status_code=413)
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+# Added before CORS so that rejections still carry CORS headers
+app.add_middleware(UploadSizeLimitMiddleware, path="/upload-audio", max_bytes=MAX_UPLOAD_BYTES)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173"],
+    allow_origins=get_settings().cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
-@app.post("/upload-audio", tags=["Transcription"])
-async def upload_audio(file: UploadFile = File(...)):
+# Compress larger JSON responses such as the transcript list
+# (Starlette leaves text/event-stream responses uncompressed)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+@app.post("/upload-audio", status_code=202, tags=["Transcription"])
+async def upload_audio(
+    background_tasks: BackgroundTasks,
+    http_response: Response,
+    file: UploadFile = File(...),
+    deepgram: DeepgramClient = Depends(get_deepgram),
+):
     """
-    Upload an audio file and transcribe it using Deepgram.
-    Returns the transcript ID and completed transcription.
+    Upload an audio file and queue it for transcription with Deepgram.
+    Returns the transcript ID immediately; poll GET /transcript/{id} for the result.
+    Audio identical to an already transcribed upload is answered right away from that transcript.
     """
     try:
         # Validate file type
         if not file.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be an audio file")
         
-        # Create initial transcript record
+        # The content type is client-supplied, so also sniff the container's magic bytes
+        head = await file.read(16)
+        await file.seek(0)
+        if not is_audio_signature(head):
+            raise HTTPException(status_code=400, detail="File must be an audio file")
+        
+        # The upload is closed once the response is sent, so keep a copy for the background task
+        audio_path = UPLOAD_DIR / f"{uuid4().hex}.audio"
         try:
-            response = supabase.table("transcripts").insert({
-                "text": "",
-                "status": "processing"
-            }).execute()
-            
-            if not response.data:
-                raise HTTPException(status_code=500, detail="Failed to create transcript record")
-                
-            transcript_id = response.data[0]['id']
-            print(f"Created transcript record with ID: {transcript_id}")
-            
+            size, audio_hash = await save_upload(file, audio_path)
+            logger.info("Audio file received, size: %d bytes", size)
+        except HTTPException:
+            audio_path.unlink(missing_ok=True)
+            raise
         except Exception as e:
-            print(f"Database error: {e}")
-            raise HTTPException(status_code=500, detail="Database error")
-
+            logger.error("Upload error: %s", e)
+            audio_path.unlink(missing_ok=True)
+            raise HTTPException(status_code=500, detail=f"Failed to save upload: {str(e)}")
+        
         try:
-            # Read the uploaded file content
-            content = await file.read()
-            print(f"Audio file received, size: {len(content)} bytes")
-
-            # STEP 1: Create a Deepgram client using the API key
-            deepgram = DeepgramClient(DEEPGRAM_API_KEY)
-            
-            # STEP 2: Prepare the payload
-            payload: FileSource = {
-                "buffer": content,
-            }
-            
-            # STEP 3: Configure Deepgram options for audio analysis
-            options = PrerecordedOptions(
-                model="nova-2",
-                smart_format=True,
-                language="en",
-                punctuate=True,
-                diarize=True,
-                utterances=False,
-            )
+            # Identical audio was already transcribed with the same options; reuse its text instead of calling Deepgram
+            options_hash = deepgram_options_hash()
+            cached_text = await find_cached_transcript(audio_hash, options_hash)
             
-            print(f"Starting transcription with Deepgram...")
-            
-            # STEP 4: Call the transcribe_file method with the payload and options
-            response = deepgram.listen.rest.v("1").transcribe_file(payload, options)
-            
-            # Extract transcript text
-            transcript_text = ""
-            if response.results and response.results.channels:
-                channel = response.results.channels[0]
-                if channel.alternatives:
-                    transcript_text = channel.alternatives[0].transcript
-            
-            if not transcript_text:
-                transcript_text = "No speech detected"
-            
-            print(f"Transcription completed: {transcript_text[:100]}...")
-            
-            # Print detailed word-level information if available
-            if response.results and response.results.channels:
-                channel = response.results.channels[0]
-                if channel.alternatives and channel.alternatives[0].words:
-                    for word in channel.alternatives[0].words:
-                        print(f"{word.word} ({word.start}s - {word.end}s, confidence: {word.confidence})")
-            
-            # Update database with final transcript
-            supabase.table("transcripts").update({
-                "text": transcript_text,
-                "status": "completed"
-            }).eq("id", transcript_id).execute()
+            # Reject instead of queueing past the Deepgram rate limit; long audio is split
+            # and spends one Deepgram request per chunk
+            duration = None
+            if cached_text is None:
+                duration = await probe_duration(audio_path)
+                expected_requests = expected_chunk_count(duration)
+                if not DEEPGRAM_LIMITER.has_capacity(expected_requests):
+                    # Time for the bucket to refill enough tokens for every chunk
+                    retry_after = math.ceil(expected_requests * DG_RATE_PERIOD / DG_RATE_LIMIT)
+                    raise HTTPException(
+                        status_code=429,
+                        detail="Too many transcription requests, please retry later",
+                        headers={"Retry-After": str(max(1, retry_after))}
+                    )
             
+            # Create initial transcript record
+            try:
+                response = await asyncio.to_thread(
+                    get_supabase().table("transcripts").insert({
+                        "text": cached_text or "",
+                        "status": "processing" if cached_text is None else "completed",
+                        "audio_hash": audio_hash,
+                        "options_hash": options_hash
+                    }).execute
+                )
+                
+                if not response.data:
+                    raise HTTPException(status_code=500, detail="Failed to create transcript record")
+                    
+                transcript_id = response.data[0]['id']
+                logger.info("Created transcript record with ID: %s", transcript_id)
+                invalidate_transcripts_cache()
+                
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error("Database error: %s", e)
+                raise HTTPException(status_code=500, detail="Database error")
+        
+        except HTTPException:
+            audio_path.unlink(missing_ok=True)
+            raise
+        
+        if cached_text is not None:
+            audio_path.unlink(missing_ok=True)
+            http_response.status_code = 200
             return {
                 "transcript_id": transcript_id,
                 "status": "completed",
-                "text": transcript_text,
-                "message": "Transcription completed successfully"
+                "text": cached_text,
+                "message": "Transcription reused from identical audio"
             }
-            
-        except Exception as e:
-            print(f"Deepgram error: {e}")
-            
-            # Update database with error
-            try:
-                supabase.table("transcripts").update({
-                    "text": f"Transcription error: {str(e)}",
-                    "status": "error"
-                }).eq("id", transcript_id).execute()
-            except:
-                pass
-                
-            raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+        
+        background_tasks.add_task(process_transcription, transcript_id, audio_path, deepgram, duration)
+        
+        return {
+            "transcript_id": transcript_id,
+            "status": "processing",
+            "message": "Transcription started"
+        }
             
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Unexpected error: {e}")
+        logger.exception("Unexpected error: %s", e)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 @app.get("/transcript/{transcript_id}", response_model=TranscriptResponse, tags=["Transcription"])
-async def get_transcript(transcript_id: int):
+async def get_transcript(transcript_id: int, request: Request, response: Response):
     """
     Get a specific transcript by ID.
+    Answers 304 Not Modified when If-None-Match matches the current ETag.
     """
     try:
-        response = supabase.table("transcripts").select("*").eq("id", transcript_id).execute()
+        result = await asyncio.to_thread(
+            get_supabase().table("transcripts").select(TRANSCRIPT_COLUMNS).eq("id", transcript_id).execute
+        )
         
-        if not response.data:
+        if not result.data:
             raise HTTPException(status_code=404, detail="Transcript not found")
-            
-        return response.data[0]
+        
+        transcript = result.data[0]
+        etag = make_etag([transcript["id"], transcript["text"], transcript["status"]])
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        
+        response.headers.update(headers)
+        return transcript
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error fetching transcript: {e}")
+        logger.error("Error fetching transcript: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch transcript")
 
+@app.get("/transcript/{transcript_id}/events", tags=["Transcription"])
+async def stream_transcript_events(transcript_id: int):
+    """
+    Stream a transcript's progress as Server-Sent Events.
+    Sends a "partial" event with the words of each audio chunk as soon as it is transcribed,
+    then a final "completed" or "error" event, or "timeout" if it is still processing after
+    TRANSCRIPTION_TIMEOUT_SECONDS.
+    """
+    async def fetch_final_event() -> Optional[dict]:
+        # The record is the source of truth when the transcription ran in another worker
+        result = await asyncio.to_thread(
+            get_supabase().table("transcripts").select("text,status").eq("id", transcript_id).execute
+        )
+        if not result.data:
+            return {"type": "error", "text": "Transcript not found"}
+        if result.data[0]["status"] == "processing":
+            return None
+        return {"type": result.data[0]["status"], "text": result.data[0]["text"]}
+    
+    async def events() -> AsyncIterator[str]:
+        # Registered here rather than in the handler so the finally below always removes it,
+        # even when the client disconnects before the body starts streaming
+        listener: asyncio.Queue = asyncio.Queue()
+        transcript_listeners[transcript_id].append(listener)
+        try:
+            loop = asyncio.get_running_loop()
+            last_sent = loop.time()
+            deadline = loop.time() + EVENTS_MAX_SECONDS
+            event = await fetch_final_event()
+            while event is None:
+                if loop.time() >= deadline:
+                    event = {"type": "timeout", "text": "Timed out waiting for the transcription"}
+                    break
+                try:
+                    event = await asyncio.wait_for(listener.get(), EVENTS_RECHECK_SECONDS)
+                except asyncio.TimeoutError:
+                    event = await fetch_final_event()
+                    if event is None and loop.time() - last_sent >= EVENTS_KEEPALIVE_SECONDS:
+                        yield ": keepalive\n\n"
+                        last_sent = loop.time()
+                    continue
+                if event["type"] == "partial":
+                    yield f"data: {json.dumps(event)}\n\n"
+                    last_sent = loop.time()
+                    event = None
+            yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.error("Error streaming transcript events: %s", e)
+        finally:
+            transcript_listeners[transcript_id].remove(listener)
+            if not transcript_listeners[transcript_id]:
+                del transcript_listeners[transcript_id]
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/transcripts", response_model=List[TranscriptResponse], tags=["Transcripts"])
-async def get_transcripts():
+async def get_transcripts(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     """
-    Retrieve all transcripts ordered by creation date (newest first).
+    Retrieve transcripts ordered by creation date (newest first), one page at a time.
     Returns a list of transcripts with their text, status, and timestamps.
+    When more transcripts exist, the X-Next-Cursor header holds the cursor for the next page.
+    Results are cached for a few seconds and carry an ETag for conditional requests.
     """
     try:
-        response = supabase.table("transcripts").select("*").order("created_at", desc=True).execute()
-        return response.data
+        page = transcripts_cache.get((limit, cursor))
+        if page is None:
+            query = get_supabase().table("transcripts").select(TRANSCRIPT_COLUMNS)
+            if cursor:
+                # Keyset pagination on (created_at, id) so the page cost doesn't grow with the table
+                created_at, transcript_id = decode_cursor(cursor)
+                query = query.or_(
+                    f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{transcript_id})'
+                )
+            result = await asyncio.to_thread(
+                query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1).execute
+            )
+            transcripts = result.data[:limit]
+            next_cursor = encode_cursor(transcripts[-1]) if len(result.data) > limit else None
+            page = (transcripts, next_cursor)
+            transcripts_cache[(limit, cursor)] = page
+        
+        transcripts, next_cursor = page
+        etag = make_etag(page)
+        headers = {"ETag": etag, "Cache-Control": f"private, max-age={TRANSCRIPTS_CACHE_TTL}"}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        
+        response.headers.update(headers)
+        return transcripts
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error fetching transcripts: {e}")
+        logger.error("Error fetching transcripts: %s", e)
         return []
 
 @app.delete("/transcript/{transcript_id}", tags=["Transcripts"])
@@ -214,17 +745,20 @@ async def delete_transcript(transcript_id: int):
     Delete a specific transcript by ID.
     """
     try:
-        response = supabase.table("transcripts").delete().eq("id", transcript_id).execute()
+        response = await asyncio.to_thread(
+            get_supabase().table("transcripts").delete().eq("id", transcript_id).execute
+        )
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Transcript not found")
-            
+        
+        invalidate_transcripts_cache()
         return {"message": "Transcript deleted successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error deleting transcript: {e}")
+        logger.error("Error deleting transcript: %s", e)
         raise HTTPException(status_code=500, detail="Failed to delete transcript")
 
 @app.get("/health", tags=["Health"])
@@ -233,4 +767,13 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=False)
\ No newline at end of file
+    # "auto" picks uvloop/httptools when installed (uvloop is not available on Windows)
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=False,
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        loop="auto",
+        http="auto",
+    )
\ No newline at end of file
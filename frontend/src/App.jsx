@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { Container, Typography, Box, Paper, Divider, Chip, Alert } from '@mui/material';
+import { Container, Typography, Box, Paper, Divider, Chip, Alert, Button } from '@mui/material';
 import AudioRecorder from './components/AudioRecorder';
 import { API_ENDPOINTS } from './config';
 
@@ -7,6 +7,8 @@ function App() {
   const [transcripts, setTranscripts] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Fetch existing transcripts on component mount
   useEffect(() => {
@@ -20,6 +22,7 @@ function App() {
       if (response.ok) {
         const data = await response.json();
         setTranscripts(data);
+        setNextCursor(response.headers.get('X-Next-Cursor'));
       } else {
         console.error('Failed to fetch transcripts');
       }
@@ -31,6 +34,28 @@ function App() {
     }
   };
 
+  // Fetch the next page of older transcripts using the cursor from the previous page
+  const loadMoreTranscripts = async () => {
+    if (!nextCursor) return;
+
+    try {
+      setLoadingMore(true);
+      const response = await fetch(`${API_ENDPOINTS.TRANSCRIPTS}?cursor=${encodeURIComponent(nextCursor)}`);
+      if (response.ok) {
+        const data = await response.json();
+        setTranscripts(prev => [...prev, ...data.filter(t => !prev.some(p => p.id === t.id))]);
+        setNextCursor(response.headers.get('X-Next-Cursor'));
+      } else {
+        console.error('Failed to fetch more transcripts');
+      }
+    } catch (error) {
+      console.error('Error fetching more transcripts:', error);
+      setError('Failed to load more transcripts');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleTranscriptionComplete = (result) => {
     console.log('Transcription completed:', result);
 
@@ -122,6 +147,14 @@ function App() {
                 {index < transcripts.length - 1 && <Divider />}
               </Box>
             ))}
+
+            {nextCursor && (
+              <Box sx={{ textAlign: 'center' }}>
+                <Button variant="outlined" onClick={loadMoreTranscripts} disabled={loadingMore}>
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </Button>
+              </Box>
+            )}
           </Box>
         )}
       </Paper>
@@ -5,12 +5,69 @@ import StopIcon from '@mui/icons-material/Stop';
 import UploadIcon from '@mui/icons-material/Upload';
 import { API_ENDPOINTS } from '../config';
 
+const POLL_INTERVAL_MS = 1000;
+// Background tasks are lost if the backend restarts, so stop waiting eventually
+const MAX_WAIT_MS = 15 * 60 * 1000;
+const TIMEOUT_MESSAGE = 'Transcription is taking too long. It may have been interrupted, please try again.';
+
+// Poll the backend until a queued transcript leaves the 'processing' state or the deadline passes
+const waitForTranscript = async (transcriptId, deadline) => {
+    while (Date.now() < deadline) {
+        const response = await fetch(API_ENDPOINTS.TRANSCRIPT(transcriptId));
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+
+        const transcript = await response.json();
+        if (transcript.status !== 'processing') {
+            return transcript;
+        }
+
+        await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
+    }
+
+    throw new Error(TIMEOUT_MESSAGE);
+};
+
+// Follow a queued transcript over Server-Sent Events until it completes or fails,
+// passing the text of each transcribed chunk to onPartial as it arrives
+const streamTranscript = (transcriptId, onPartial, deadline) => new Promise((resolve, reject) => {
+    const source = new EventSource(API_ENDPOINTS.TRANSCRIPT_EVENTS(transcriptId));
+    const timer = setTimeout(() => {
+        source.close();
+        reject(new Error(TIMEOUT_MESSAGE));
+    }, deadline - Date.now());
+
+    source.onmessage = (message) => {
+        const event = JSON.parse(message.data);
+        if (event.type === 'partial') {
+            onPartial(event.chunk, event.text);
+            return;
+        }
+
+        source.close();
+        clearTimeout(timer);
+        if (event.type === 'timeout') {
+            reject(new Error(TIMEOUT_MESSAGE));
+        } else {
+            resolve({ id: transcriptId, status: event.type, text: event.text });
+        }
+    };
+
+    source.onerror = () => {
+        source.close();
+        clearTimeout(timer);
+        reject(new Error('Transcript event stream failed'));
+    };
+});
+
 const AudioRecorder = ({ onTranscriptionComplete }) => {
     const [isRecording, setIsRecording] = useState(false);
     const [isProcessing, setIsProcessing] = useState(false);
     const [error, setError] = useState(null);
     const [recordedBlob, setRecordedBlob] = useState(null);
     const [recordingDuration, setRecordingDuration] = useState(0);
+    const [partialText, setPartialText] = useState('');
     const mediaRecorder = useRef(null);
     const audioChunks = useRef([]);
     const recordingTimer = useRef(null);
@@ -101,6 +158,14 @@ const AudioRecorder = ({ onTranscriptionComplete }) => {
 
         setIsProcessing(true);
         setError(null);
+        setPartialText('');
+
+        // Chunks of long recordings can finish out of order; keep them sorted by index
+        const partials = [];
+        const handlePartial = (chunk, text) => {
+            partials[chunk] = text;
+            setPartialText(partials.filter(Boolean).join(' '));
+        };
 
         try {
             console.log('Uploading audio for transcription...');
@@ -121,7 +186,30 @@ const AudioRecorder = ({ onTranscriptionComplete }) => {
                 throw new Error(errorData.detail || `HTTP ${response.status}: ${response.statusText}`);
             }
 
-            const result = await response.json();
+            const upload = await response.json();
+            console.log('Transcription queued:', upload);
+
+            // Transcription runs in the background; wait for it to finish (up to MAX_WAIT_MS)
+            const deadline = Date.now() + MAX_WAIT_MS;
+            // unless the backend already had a transcript for this audio
+            const transcript = upload.status === 'completed'
+                ? { id: upload.transcript_id, status: upload.status, text: upload.text }
+                : await streamTranscript(upload.transcript_id, handlePartial, deadline)
+                    .catch((streamError) => {
+                        if (streamError.message === TIMEOUT_MESSAGE) {
+                            throw streamError;
+                        }
+                        return waitForTranscript(upload.transcript_id, deadline);
+                    });
+            if (transcript.status === 'error') {
+                throw new Error(`Transcription failed: ${transcript.text}`);
+            }
+
+            const result = {
+                transcript_id: transcript.id,
+                status: transcript.status,
+                text: transcript.text
+            };
             console.log('Transcription result:', result);
 
             // Call the callback with the transcription result
@@ -141,6 +229,8 @@ const AudioRecorder = ({ onTranscriptionComplete }) => {
 
             if (error.message.includes('Failed to fetch')) {
                 errorMessage = 'Cannot connect to server. Please make sure the backend is running.';
+            } else if (error.message === TIMEOUT_MESSAGE) {
+                errorMessage = TIMEOUT_MESSAGE;
             } else if (error.message.includes('File must be an audio file')) {
                 errorMessage = 'Invalid audio format. Please try recording again.';
             } else if (error.message.includes('Transcription failed')) {
@@ -152,6 +242,7 @@ const AudioRecorder = ({ onTranscriptionComplete }) => {
             setError(errorMessage);
         } finally {
             setIsProcessing(false);
+            setPartialText('');
         }
     };
 
@@ -245,6 +336,11 @@ const AudioRecorder = ({ onTranscriptionComplete }) => {
                     <Typography variant="caption" color="text.secondary" sx={{ mt: 1, display: 'block' }}>
                         This may take a few moments depending on the audio length
                     </Typography>
+                    {partialText && (
+                        <Typography variant="body2" color="text.secondary" sx={{ mt: 1 }}>
+                            {partialText}
+                        </Typography>
+                    )}
                 </Box>
             )}
 
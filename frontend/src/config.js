@@ -5,6 +5,7 @@ export const API_ENDPOINTS = {
     UPLOAD_AUDIO: `${API_BASE_URL}/upload-audio`,
     TRANSCRIPTS: `${API_BASE_URL}/transcripts`,
     TRANSCRIPT: (id) => `${API_BASE_URL}/transcript/${id}`,
+    TRANSCRIPT_EVENTS: (id) => `${API_BASE_URL}/transcript/${id}/events`,
     HEALTH: `${API_BASE_URL}/health`
 };
 